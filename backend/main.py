@@ -1,41 +1,106 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from router import summarization, translator, auth,tts,auth
+from fastapi.responses import ORJSONResponse
+from redis.asyncio import Redis
+from router import summarization, translator, auth, tts
 from fastapi import Depends
+from service.config import settings
+from service.summarizer import summarization_service
+from service import translator as translator_service
+from service.tts import tts_dispatcher
+from middleware import BodySizeLimitMiddleware, TimingMiddleware
 
-# app = FastAPI()
-app = FastAPI()
+# Logging is configured once here; modules only call logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Process pools start after model/ORT/torch threads exist; forking a multithreaded
+# process can deadlock the children, so workers come from a clean forkserver instead
+# (spawn where forkserver doesn't exist, e.g. Windows)
+POOL_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Each server worker process gets its share of the cores (same split as ORT/torch threads)
+CORES_PER_WORKER = max(1, (os.cpu_count() or 1) // settings.WORKERS)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    Path(tts.AUDIO_DIR).mkdir(parents=True, exist_ok=True)
+    # Shared Redis client (guest rate-limit counters)
+    app.state.redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    # Load models and clients once per worker instead of on each request
+    await summarization_service.initialize()
+    summarization_service.redis = app.state.redis
+    summarization_service.batcher.start()
+    app.state.pdf_pool = ProcessPoolExecutor(
+        max_workers=CORES_PER_WORKER, mp_context=POOL_MP_CONTEXT
+    )
+    summarization_service.pdf_pool = app.state.pdf_pool
+    summarization_service.pdf_pool_workers = CORES_PER_WORKER
+    translator_service.initialize()
+    # Speech synthesis runs in worker processes so it never competes with the event loop
+    app.state.tts_pool = ProcessPoolExecutor(
+        max_workers=CORES_PER_WORKER, mp_context=POOL_MP_CONTEXT
+    )
+    tts_dispatcher.start(executor=app.state.tts_pool)
+    yield
+    await tts_dispatcher.stop()
+    app.state.tts_pool.shutdown()
+    await summarization_service.batcher.stop()
+    app.state.pdf_pool.shutdown()
+    await app.state.redis.aclose()
 
-# CORS setup
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Reject oversized TTS bodies before they are read or validated
+# (registered first so CORS and timing still wrap the 413)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/api/tts/synthesize": (
+            tts.max_body_bytes(tts.GUEST_CHAR_LIMIT),
+            tts.max_body_bytes(tts.PREMIUM_CHAR_LIMIT)
+        )
+    }
+)
+
+# CORS setup (single instance, explicit origins)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Request timing (pure ASGI - do not subclass BaseHTTPMiddleware)
+app.add_middleware(TimingMiddleware)
+
 # Public endpoints   #! summarization
 app.include_router(
     summarization.router,
-    prefix="/api/summarize",
-    tags=["Summarization"]
+    prefix="/api/summarize"
 )
 
 # Protected endpoints  #! translate
 app.include_router(
     translator.router,
     prefix="/api/translate",
-    tags=["Translation"],
     # dependencies=[Depends(auth.get_current_user)]  # Global protection
 )
 
 #! tts
 app.include_router(
     tts.router,
-    prefix="/api/tts",
-    tags=["Text-to-Speech"]
+    prefix="/api/tts"
 )
 
 # Auth endpoints
@@ -44,4 +109,3 @@ app.include_router(
     prefix="/auth",
     tags=["Authentication"]
 )
-
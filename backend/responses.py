@@ -0,0 +1,42 @@
+import os
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+
+ZEROCOPY_SEND = "http.response.zerocopysend"
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that hands the file descriptor to the server when it supports
+    the ASGI zero-copy send extension, so the kernel copies the file straight
+    to the socket. Otherwise (and for HEAD/Range requests) it behaves exactly
+    like FileResponse.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if (
+            ZEROCOPY_SEND not in scope.get("extensions", {})
+            or scope["method"].upper() == "HEAD"
+            or "range" in Headers(scope=scope)
+        ):
+            return await super().__call__(scope, receive, send)
+
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            await send({"type": ZEROCOPY_SEND, "file": fd, "more_body": False})
+        finally:
+            os.close(fd)
+
+        if self.background is not None:
+            await self.background()
@@ -1,11 +1,12 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from models import user
-from schemas.auth import UserCreate, User, Token, UserLogin
+from schemas.auth import UserCreate, User, UserOut, Token, UserLogin
 from schemas.user import UserInDB,UserCreate
 from models.user import User as UserModel 
 from fastapi.security import OAuth2PasswordRequestForm
@@ -20,7 +21,9 @@ from service.auth import (
     authenticate_user,
     create_access_token,
     get_password_hash,
-    get_user
+    get_user,
+    revoke_token,
+    oauth2_scheme
 )
 
 router = APIRouter()
@@ -29,13 +32,13 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login(
     user_login: UserLogin,  # Uses our custom schema instead of OAuth2 form
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login with email and password.
     Returns access token for authenticated users.
     """
-    user = authenticate_user(db, user_login.email, user_login.password)
+    user = await authenticate_user(db, user_login.email, user_login.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,11 +60,11 @@ async def login(
 @router.post("/register", response_model=UserInDB)
 async def register_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         # Check if user exists
-        existing_user = db.query(UserModel).filter(UserModel.email == user_data.email).first()
+        existing_user = await get_user(db, user_data.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,24 +75,29 @@ async def register_user(
         db_user = UserModel(
             email=user_data.email,
             name=user_data.name,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await run_in_threadpool(get_password_hash, user_data.password),
             credits=100,
             active=True
         )
         
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         
         return db_user
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Registration failed: {str(e)}"
         )
 
-@router.get("/me", response_model=User)
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: Request, token: Annotated[str, Depends(oauth2_scheme)]):
+    """Revoke this token; it is rejected by every worker until it expires"""
+    await revoke_token(request.app.state.redis, token)
+
+@router.get("/me", response_model=UserOut)
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
\ No newline at end of file
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile
 from fastapi.security import HTTPBearer
 from schemas.summarization import SummaryRequest, TextSummaryResponse, FileSummaryResponse, FileMetadata
 from models.user import User
 from typing import Optional, Dict, Tuple
 from database import get_db
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from service.auth import get_current_user_optional
-from datetime import datetime, date
+from service.credits import consume_credit
+import hashlib
+import time
+from pathlib import Path
+from redis.asyncio import Redis
 import logging
 from service.summarizer import summarization_service
 
@@ -15,29 +19,28 @@ router = APIRouter(tags=["Summarization"])
 security = HTTPBearer(auto_error=False)
 
 # Logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Guest usage config
-guest_usage: Dict[Tuple[str, date], int] = {}
+# Guest usage config (counters live in Redis so every worker shares them)
 GUEST_DAILY_LIMIT = 5
+GUEST_USAGE_TTL_SECONDS = 86400
 MAX_GUEST_TEXT_LENGTH = 5000
 MAX_FILE_SIZE_MB = 10
 
-def check_guest_limits(ip: str) -> Tuple[bool, int]:
+async def check_guest_limits(redis: Redis, ip: str) -> Tuple[bool, int]:
     try:
-        today = datetime.now().date()
-        key = (ip, today)
-        current = guest_usage.get(key, 0)
-        if current >= GUEST_DAILY_LIMIT:
-            return False, 0
-        guest_usage[key] = current + 1
-        return True, GUEST_DAILY_LIMIT - (current + 1)
+        day = int(time.time() // GUEST_USAGE_TTL_SECONDS)
+        key = f"guest:{ip}:{day}"
+        pipe = redis.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, GUEST_USAGE_TTL_SECONDS)
+        count, _ = await pipe.execute()
+        return count <= GUEST_DAILY_LIMIT, max(0, GUEST_DAILY_LIMIT - count)
     except Exception as e:
-        logger.error(f"Guest limit check failed: {e}")
+        logger.error("Guest limit check failed: %s", e)
         return False, 0
 
-async def validate_text_content(text: str, is_guest: bool, client_host: str) -> Tuple[int, Optional[int], Optional[str]]:
+async def validate_text_content(text: str, is_guest: bool, client_host: str, redis: Redis) -> Tuple[int, Optional[int], Optional[str]]:
     if not text.strip():
         return 0, None, "Text cannot be empty"
     
@@ -47,16 +50,16 @@ async def validate_text_content(text: str, is_guest: bool, client_host: str) ->
     if is_guest:
         if char_count > MAX_GUEST_TEXT_LENGTH:
             return char_count, None, f"Guest limit: {MAX_GUEST_TEXT_LENGTH} characters max"
-        allowed, remaining = check_guest_limits(client_host)
+        allowed, remaining = await check_guest_limits(redis, client_host)
         if not allowed:
             return char_count, None, f"Daily limit reached ({GUEST_DAILY_LIMIT} summaries)"
     
     return char_count, remaining, None
 
-async def validate_file_content(file: UploadFile, is_guest: bool, client_host: str) -> Tuple[Optional[int], Optional[str]]:
+async def validate_file_content(file: UploadFile, is_guest: bool, client_host: str, redis: Redis) -> Tuple[Optional[int], Optional[str]]:
     remaining = None
     if is_guest:
-        allowed, remaining = check_guest_limits(client_host)
+        allowed, remaining = await check_guest_limits(redis, client_host)
         if not allowed:
             return None, f"Daily limit reached ({GUEST_DAILY_LIMIT} summaries)"
         file.file.seek(0, 2)
@@ -66,35 +69,33 @@ async def validate_file_content(file: UploadFile, is_guest: bool, client_host: s
             return None, f"File too large. Max {MAX_FILE_SIZE_MB}MB allowed"
     return remaining, None
 
-async def handle_premium_user(user: User, db: Session) -> Dict:
-    try:
-        if user.credits <= 0:
-            raise HTTPException(status_code=402, detail="No credits remaining. Please top up.")
-        user.credits -= 1
-        db.commit()
-        return {
-            "premium": True,
-            "remaining_credits": user.credits,
-            "max_text_length": "Unlimited"
-        }
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Failed to update user credits: {e}")
-        raise HTTPException(status_code=500, detail="Failed to process your request")
+async def handle_premium_user(user: User, db: AsyncSession) -> Dict:
+    remaining = await consume_credit(db, user)
+    if remaining is None:
+        raise HTTPException(status_code=402, detail="No credits remaining. Please top up.")
+    return {
+        "premium": True,
+        "remaining_credits": remaining,
+        "max_text_length": "Unlimited"
+    }
+
+def summary_etag(summary: str) -> str:
+    return f'"{hashlib.blake2b(summary.encode(), digest_size=16).hexdigest()}"'
 
 @router.post("/text", response_model=TextSummaryResponse, summary="Summarize text input (guest access allowed)")
 async def summarize_text(
     request: Request,
+    response: Response,
     summary_request: SummaryRequest,
     user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        await summarization_service.initialize()
-
         is_guest = user is None
         client_host = request.client.host
-        char_count, remaining, error = await validate_text_content(summary_request.text, is_guest, client_host)
+        char_count, remaining, error = await validate_text_content(
+            summary_request.text, is_guest, client_host, request.app.state.redis
+        )
         if error:
             raise HTTPException(status_code=400 if "limit" in error else 422, detail=error)
 
@@ -129,12 +130,13 @@ async def summarize_text(
 
         response_data["summary"] = summary
         response_data["success"] = True
+        response.headers["ETag"] = summary_etag(summary)
         return response_data
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Text summarization failed: {str(e)}", exc_info=True)
+        logger.error("Text summarization failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Text summarization failed")
 
 @router.post("/file", response_model=FileSummaryResponse, summary="Summarize file upload (guest access allowed)")
@@ -143,17 +145,21 @@ async def summarize_file(
     file: UploadFile,
     method: str = "transformers",  # optionally make this dynamic via form-data
     user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    temp_file_path = None
     try:
-        await summarization_service.initialize()
-
         is_guest = user is None
         client_host = request.client.host
-        remaining, error = await validate_file_content(file, is_guest, client_host)
+        remaining, error = await validate_file_content(
+            file, is_guest, client_host, request.app.state.redis
+        )
         if error:
             raise HTTPException(status_code=400, detail=error)
 
+        # Stream the upload once for size, hash and (PDF only) a temp copy for the extractor
+        temp_file_path, file_size, content_hash = await summarization_service.save_upload(file)
+
         response_data = {
             "summary": "",
             "is_guest": is_guest,
@@ -166,7 +172,7 @@ async def summarize_file(
             "file_metadata": FileMetadata(
                 filename=file.filename,
                 content_type=file.content_type,
-                size_kb=round(len(await file.read()) / 1024, 2),
+                size_kb=round(file_size / 1024, 2),
                 pages=None,
                 word_count=None,
                 language=None
@@ -174,12 +180,13 @@ async def summarize_file(
             "method_used": method,
             "compression_ratio": 0.3
         }
-        file.file.seek(0)  # reset pointer after size read
 
         if not is_guest:
             response_data.update(await handle_premium_user(user, db))
 
-        summary = await summarization_service.process_uploaded_file(file, method=method)
+        summary = await summarization_service.process_uploaded_file(
+            file, method=method, temp_file_path=temp_file_path, content_hash=content_hash
+        )
         response_data["summary"] = summary
         response_data["success"] = True
         response_data["characters_processed"] = len(summary)
@@ -188,5 +195,8 @@ async def summarize_file(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"File summarization failed: {str(e)}", exc_info=True)
+        logger.error("File summarization failed: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="File summarization failed")
+    finally:
+        if temp_file_path:
+            Path(temp_file_path).unlink(missing_ok=True)
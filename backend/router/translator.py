@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from service.auth import get_current_active_user, get_current_user_optional
 from models.user import User
 from database import get_db
@@ -28,8 +29,9 @@ async def get_languages():
 async def translate_text_endpoint(
     text: str,
     target_language: str,
+    source_language: str = "auto",
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Translate text with authentication and limits
@@ -65,7 +67,7 @@ async def translate_text_endpoint(
         
         # Deduct one credit per translation
         current_user.credits -= 1
-        db.commit()
+        await db.commit()
     else:
         if len(text) > GUEST_CHAR_LIMIT:
             raise HTTPException(
@@ -75,7 +77,10 @@ async def translate_text_endpoint(
 
     # Perform translation
     try:
-        translated_text = translate_text(text, target_language)
+        # Model inference / HTTP call: keep it off the event loop
+        translated_text = await run_in_threadpool(
+            translate_text, text, target_language, source_language
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,7 +90,7 @@ async def translate_text_endpoint(
     # Prepare response
     response = {
         "translation": translated_text,
-        "source_language": "auto",
+        "source_language": source_language,
         "target_language": target_language,
         "character_count": len(text),
         "is_guest": current_user is None
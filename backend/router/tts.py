@@ -1,28 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from service.auth import get_current_active_user, get_current_user_optional
-from service.tts import generate_speech
+from service.tts import audio_extension, generate_speech
+from service.credits import consume_credit
 from models.user import User
 from database import get_db
 from schemas.tts import TTSRequest, TTSResponse
+from responses import ZeroCopyFileResponse
+from service.config import settings
+import hashlib
 import os
 from typing import Optional
 
 router = APIRouter(tags=["Text-to-Speech"])
-AUDIO_DIR = "static/audio"
-os.makedirs(AUDIO_DIR, exist_ok=True)
+AUDIO_DIR = "static/audio"  # created at app startup
+# Path template built once instead of os.path.join per request
+AUDIO_PATH_TEMPLATE = os.path.join(AUDIO_DIR, "tts_{}{}")
+AUDIO_MEDIA_TYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav"}
 
 # Constants for limits
 GUEST_CHAR_LIMIT = 300
 PREMIUM_CHAR_LIMIT = 5000
 
+# Upper bound on the JSON body for a given character limit: a JSON-escaped
+# character takes at most 6 bytes (\uXXXX), plus room for the other fields
+def max_body_bytes(char_limit: int) -> int:
+    return char_limit * 6 + 1024
+
+# Generated audio never changes for a given filename
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def audio_cache_key(text: str, language: str, speed: float) -> str:
+    """Stable digest of everything that affects the generated audio"""
+    return hashlib.blake2b(f"{speed}|{language}|".encode() + text.encode(), digest_size=16).hexdigest()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check per RFC 9110: "*", comma-separated lists, weak comparison"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
 @router.post("/synthesize", response_model=TTSResponse)
 async def synthesize_speech(
     request: Request,
     tts_request: TTSRequest,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Convert text to speech with authentication and limits"""
     # Check character limits
@@ -40,32 +69,36 @@ async def synthesize_speech(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Maximum {PREMIUM_CHAR_LIMIT} characters allowed per request"
             )
-        
-        # Deduct credits if needed
-        if current_user.credits <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Insufficient credits"
-            )
-        current_user.credits -= 1
-        db.commit()
 
-    # Generate audio file
-    filename = f"tts_{hash(tts_request.text)}.mp3"
-    filepath = os.path.join(AUDIO_DIR, filename)
-    
-    await generate_speech(
-        text=tts_request.text,
-        lang=tts_request.language,
-        output_path=filepath,
-        speed=tts_request.speed
-    )
+    # Content-addressed file: identical requests reuse the audio from disk
+    key = audio_cache_key(tts_request.text, tts_request.language, tts_request.speed)
+    filepath = AUDIO_PATH_TEMPLATE.format(key, audio_extension(tts_request.language))
+    filename = os.path.basename(filepath)
+
+    if not await run_in_threadpool(os.path.exists, filepath):
+        # Deduct credits only when audio is actually generated
+        if current_user is not None:
+            remaining = await consume_credit(db, current_user)
+            if remaining is None:
+                raise HTTPException(
+                    status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                    detail="Insufficient credits"
+                )
+            current_user.credits = remaining
+
+        await generate_speech(
+            text=tts_request.text,
+            lang=tts_request.language,
+            output_path=filepath,
+            speed=tts_request.speed
+        )
     
-    # Prepare response
-    response = TTSResponse(
+    # Prepare response (server-built data: skip validation)
+    response = TTSResponse.model_construct(
         audio_url=f"/audio/{filename}",
         text_length=text_length,
-        is_guest=current_user is None
+        is_guest=current_user is None,
+        premium_features=None
     )
     
     if current_user:  # Add premium features
@@ -75,22 +108,44 @@ async def synthesize_speech(
             "remaining_credits": current_user.credits
         }
     
-    return response
+    # Returning the response class directly skips FastAPI's response_model re-validation
+    return ORJSONResponse(content=response.model_dump())
 
 @router.get("/audio/{filename}")
-async def get_audio_file(
+def get_audio_file(
     filename: str,
+    request: Request,
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-    """Serve generated audio files (public access)"""
+    """Serve generated audio files (public access)
+
+    Plain def: the stat below is blocking I/O, so FastAPI runs this in its threadpool.
+    """
     filepath = os.path.join(AUDIO_DIR, filename)
     if not os.path.exists(filepath):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Audio file not found"
         )
-    return FileResponse(
+
+    # Filenames are content digests, so the name itself is a strong validator
+    stem, extension = os.path.splitext(filename)
+    media_type = AUDIO_MEDIA_TYPES.get(extension, "application/octet-stream")
+    headers = {
+        "ETag": f'"{stem}"',
+        "Cache-Control": AUDIO_CACHE_CONTROL
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Behind Nginx: return headers only and let the proxy send the file
+    if settings.AUDIO_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = f"{settings.AUDIO_ACCEL_REDIRECT_PREFIX}{filename}"
+        return Response(media_type=media_type, headers=headers)
+
+    return ZeroCopyFileResponse(
         path=filepath,
-        media_type="audio/mpeg",
-        filename=filename  # Helps with downloads
+        media_type=media_type,
+        filename=filename,  # Helps with downloads
+        headers=headers
     )
\ No newline at end of file
@@ -1,12 +1,3 @@
-from pydantic import BaseModel
-
-class SummaryRequest(BaseModel):
-    text: str
-
-class TranslateRequest(BaseModel):
-    text: str
-    target_lang: str = "es"  # Default to Spanish
-
-class TTSRequest(BaseModel):
-    text: str
-    lang: str = "en"
\ No newline at end of file
+from .summarization import SummaryRequest as SummaryRequest
+from .translation import TranslateRequest as TranslateRequest
+from .tts import TTSRequest as TTSRequest
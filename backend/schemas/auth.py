@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -12,8 +12,17 @@ class User(UserBase):
     credits: int
     active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class UserOut(BaseModel):
+    """Response-only user: data comes from the DB, so email is not re-validated"""
+    id: int
+    email: str
+    name: str
+    credits: int
+    active: bool
+
+    model_config = ConfigDict(from_attributes=True)
 
 class UserLogin(BaseModel):
     email: EmailStr
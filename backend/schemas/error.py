@@ -1,13 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class HTTPError(BaseModel):
     """Base error response schema"""
     detail: str
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {"detail": "Error message here"}
         }
+    )
 
 class ValidationError(BaseModel):
     """Schema for 422 validation errors"""
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 class UserBase(BaseModel):
@@ -8,10 +8,12 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
-class UserInDB(UserBase):
+class UserInDB(BaseModel):
+    # Response-only: plain str email, no EmailStr re-validation
     # id: int
+    email: str
+    name: str
     credits: int
     active: bool
 
-    class Config:
-        from_attributes = True  # For ORM mode (previously called orm_mode)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)  # For ORM mode (previously called orm_mode)
\ No newline at end of file
@@ -1,10 +1,17 @@
 from datetime import datetime, timedelta
+import hashlib
+import logging
+import time
 from typing import Annotated, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from models.user import User
@@ -12,12 +19,58 @@ from schemas.auth import TokenData
 from service.config import settings  
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+logger = logging.getLogger(__name__)
+
 
 # Security utilities
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id for new hashes; existing bcrypt hashes still verify and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1
+)
+# Verified against when the user doesn't exist, so both paths take the same time
+DUMMY_PASSWORD_HASH = pwd_context.hash("dummy-password")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 security = HTTPBearer(auto_error=False)
 
+# Verified tokens: sha256(token) -> (user_id, exp). Entries are also bounded by `exp`.
+token_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _revoked_key(key: bytes) -> str:
+    return f"revoked:{key.hex()}"
+
+def invalidate_token(token: str) -> None:
+    """Drop a token from the verification cache"""
+    token_cache.pop(_token_key(token), None)
+
+async def revoke_token(redis: Redis, token: str) -> None:
+    """
+    Deny a token until it expires (logout). The denylist lives in Redis so every
+    worker sees it; entries expire together with the token.
+    """
+    invalidate_token(token)
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return  # invalid or expired: already unusable
+    ttl = int(payload["exp"] - time.time())
+    if ttl > 0:
+        await redis.set(_revoked_key(_token_key(token)), 1, ex=ttl)
+
+async def _is_revoked(redis: Redis, key: bytes) -> bool:
+    try:
+        return bool(await redis.exists(_revoked_key(key)))
+    except Exception as e:
+        # Fail closed: a logged-out token must never be accepted
+        logger.error("Token revocation check failed: %s", e)
+        return True
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -26,15 +79,27 @@ def get_password_hash(password: str) -> str:
     """Create hashed password"""
     return pwd_context.hash(password)
 
-def get_user(db: Session, email: str) -> Optional[User]:
+async def get_user(db: AsyncSession, email: str) -> Optional[User]:
     """Retrieve user by email"""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user credentials"""
-    user = get_user(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await get_user(db, email)
+    if user is None:
+        await run_in_threadpool(verify_password, password, DUMMY_PASSWORD_HASH)
         return None
+
+    # Hashing is CPU-bound; keep it off the event loop
+    verified, new_hash = await run_in_threadpool(
+        pwd_context.verify_and_update, password, user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
@@ -51,8 +116,9 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     )
 
 async def get_current_user(
+    request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Dependency to get current authenticated user"""
     credentials_exception = HTTPException(
@@ -60,6 +126,20 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    key = _token_key(token)
+    if await _is_revoked(request.app.state.redis, key):
+        token_cache.pop(key, None)
+        raise credentials_exception
+
+    cached = token_cache.get(key)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > time.time():
+            user = await db.get(User, user_id)
+            if user is not None:
+                return user
+        token_cache.pop(key, None)
+
     try:
         payload = jwt.decode(
             token,
@@ -73,8 +153,9 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    if (user := get_user(db, email=token_data.email)) is None:
+    if (user := await get_user(db, email=token_data.email)) is None:
         raise credentials_exception
+    token_cache[key] = (user.id, payload["exp"])
     return user
 
 async def get_current_active_user(
@@ -89,15 +170,16 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_user_optional(
-    token: Optional[str] = Depends(security),
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ) -> Optional[User]:
     """Dependency that returns user if authenticated, None otherwise"""
-    if not token:
+    # Guests (no bearer header) are the common case: skip all JWT/DB work
+    authorization = request.headers.get("authorization")
+    if not authorization or authorization[:7].lower() != "bearer ":
         return None
-    
+
     try:
-        credential = getattr(token, "credentials", token)
-        return await get_current_user(credential, db)
+        return await get_current_user(request, authorization[7:].strip(), db)
     except (JWTError, HTTPException):
         return None
\ No newline at end of file
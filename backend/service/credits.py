@@ -0,0 +1,21 @@
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+
+async def consume_credit(db: AsyncSession, user: User) -> Optional[int]:
+    """
+    Atomically take one credit from the user.
+    Returns the remaining credits, or None if the user had none left.
+    """
+    # Check and decrement in one statement so concurrent requests can't double-spend
+    result = await db.execute(
+        update(User)
+        .where(User.id == user.id, User.credits > 0)
+        .values(credits=User.credits - 1)
+        .returning(User.credits)
+    )
+    remaining = result.scalar_one_or_none()
+    await db.commit()
+    return remaining
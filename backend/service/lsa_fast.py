@@ -0,0 +1,32 @@
+import numpy as np
+from nltk.tokenize import sent_tokenize
+from scipy.sparse.linalg import svds
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+def lsa_summarize(text: str, sentences_count: int, language: str = "english") -> str:
+    """
+    LSA extractive summary: sparse TF-IDF term-sentence matrix + truncated SVD.
+    Sentences are ranked by the length of their vector in the topic space
+    and returned in their original order.
+    """
+    sentences = sent_tokenize(text, language=language)
+    if len(sentences) <= sentences_count:
+        return " ".join(sentences)
+
+    try:
+        # Rows are terms, columns are sentences (as in the classic LSA formulation)
+        matrix = TfidfVectorizer(stop_words=language).fit_transform(sentences).T.astype(np.float64)
+    except ValueError:
+        # Nothing but stop words / punctuation: fall back to the leading sentences
+        return " ".join(sentences[:sentences_count])
+
+    k = min(sentences_count, min(matrix.shape) - 1)
+    if k < 1:
+        return " ".join(sentences[:sentences_count])
+
+    _, singular_values, vt = svds(matrix, k=k)
+    scores = np.linalg.norm(singular_values[:, None] * vt, axis=0)
+
+    top = np.sort(np.argsort(scores)[-sentences_count:])
+    return " ".join(sentences[i] for i in top)
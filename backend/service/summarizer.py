@@ -1,37 +1,206 @@
+import asyncio
+import hashlib
 import logging
-from typing import Union
-from pathlib import Path
+import os
+import re
 import tempfile
-import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
+from importlib.util import find_spec
+from itertools import repeat
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Tuple, Union
+
+import aiofiles
+import docx
+import fitz  # PyMuPDF
+from cachetools import LRUCache
 from fastapi import UploadFile, HTTPException, status
-from schemas.summarization import SummaryRequest
-import PyPDF2
 from pptx import Presentation
-import docx
-from pydantic_settings import BaseSettings
-import re
+
+from schemas.summarization import SummaryRequest
 from service.config import settings
 
-# Set up logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
-
 ALLOWED_FILE_TYPES = {
     'application/pdf': '.pdf',
     'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
     'application/vnd.openxmlformats-officedocument.presentationml.presentation': '.pptx'
 }
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Extracted from a temp file path; other types are parsed from the upload stream itself
+PATH_EXTRACTED_TYPES = {'.pdf'}
+
+# DrawingML paragraph / text / line-break elements in slide XML
+PPTX_PARAGRAPH_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/main}p"
+PPTX_TEXT_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/main}t"
+PPTX_BREAK_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/main}br"
+
+# Whitespace runs (group 1) or characters clean_text drops
+CLEAN_TEXT_RE = re.compile(r'(\s+)|[^\w\s.,;:!?()-]+')
+
+# ONNX graphs produced by exporting a seq2seq model
+ONNX_COMPONENTS = ("encoder_model", "decoder_model", "decoder_with_past_model")
+
+# Dynamic batching of concurrent summarize calls
+MAX_BATCH_SIZE = 8
+MAX_BATCH_WAIT_SECONDS = 0.02
+# Texts in one forward pass are at most this many times longer than the shortest
+BUCKET_LENGTH_RATIO = 2
+
+# Dedicated pools so document parsing can't starve model inference (and vice versa)
+# on the loop's default executor, which every other library also shares
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="extract")
+_CPU_POOL = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 1) // 2),
+    thread_name_prefix="summarize"
+)
+
+# Decoding settings used when settings.FAST_GENERATION is on
+FAST_GENERATION_KWARGS = {
+    "num_beams": 2,
+    "early_stopping": True,
+    "no_repeat_ngram_size": 3,
+    "length_penalty": 2.0,
+}
+
+# Warmup inputs ("warmup text " * n) run once at startup
+WARMUP_INPUT_REPEATS = (50, 200)
+
+# Upper bound on characters per token, used to pre-cut text before tokenizing it
+MAX_CHARS_PER_TOKEN = 32
+
+# Long inputs are split into overlapping token windows that fit BART's 1024-token encoder
+CHUNK_MAX_TOKENS = 900
+CHUNK_STRIDE_TOKENS = 100
+
+# PDFs with fewer pages are extracted serially; process startup would dominate
+PARALLEL_PDF_MIN_PAGES = 4
+
+SUMMARY_CACHE_SIZE = 1024
+# Extracted + cleaned text of recent uploads, keyed by SHA-256 of the file bytes
+TEXT_CACHE_SIZE = 256
+SUMMARY_CACHE_TTL_SECONDS = 86400
+
+
+class SummaryBatcher:
+    """Coalesces concurrent summarize calls into one batched model forward pass"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[str], int, int], List[str]],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait: float = MAX_BATCH_WAIT_SECONDS,
+        executor: Optional[Executor] = None
+    ):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = None
+        self.worker = None
+
+    def start(self):
+        if self.worker is None:
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    async def submit(self, text: str, max_length: int, min_length: int) -> str:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, max_length, min_length, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for one item, then gather more until the batch is full or the window closes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+
+            # Only requests with the same generation lengths can share a forward pass
+            groups = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+
+            for (max_length, min_length), group in groups.items():
+                for items in _length_buckets(group):
+                    await self._run_items(loop, items, max_length, min_length)
+
+    async def _run_items(self, loop, items: list, max_length: int, min_length: int):
+        texts = [item[0] for item in items]
+        try:
+            summaries = await loop.run_in_executor(
+                self.executor, self.run_batch, texts, max_length, min_length
+            )
+        except Exception as e:
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), summary in zip(items, summaries):
+            if not future.done():
+                future.set_result(summary)
+
+
+def _length_buckets(items: list) -> List[list]:
+    """
+    Sort by text length and split wherever a text is more than BUCKET_LENGTH_RATIO
+    times the shortest in its bucket, so short inputs aren't padded to long ones
+    """
+    buckets = []
+    for item in sorted(items, key=lambda item: len(item[0])):
+        if buckets and len(item[0]) <= BUCKET_LENGTH_RATIO * max(1, len(buckets[-1][0][0])):
+            buckets[-1].append(item)
+        else:
+            buckets.append([item])
+    return buckets
+
+
 class SummarizationService:
     def __init__(self):
         self.summarizer_pipeline = None
+        self.tokenizer = None
+        # Separate tokenizer for chunking/truncation: HF fast tokenizers switch truncation
+        # settings in place, so the pipeline's instance can't be shared across threads
+        self.text_tokenizer = None
+        self.text_tokenizer_lock = threading.Lock()
         self.model_loaded = False
         self.model_loading_lock = asyncio.Lock()
+        self.batcher = SummaryBatcher(self._sync_summarize_batch, executor=_CPU_POOL)
+        self.summary_cache = LRUCache(maxsize=SUMMARY_CACHE_SIZE)
+        self.text_cache = LRUCache(maxsize=TEXT_CACHE_SIZE)
+        # Optional shared cache (set at app startup) so hits carry across workers
+        self.redis = None
+        # Optional process pool (set at app startup) for per-page PDF extraction
+        self.pdf_pool = None
+        self.pdf_pool_workers = 1
 
     async def initialize(self):
         """Lazy loading of models with thread safety"""
@@ -39,26 +208,123 @@ class SummarizationService:
             async with self.model_loading_lock:
                 if not self.model_loaded:
                     await self._load_models()
+                    loop = asyncio.get_event_loop()
+                    await loop.run_in_executor(_CPU_POOL, self._warmup)
                     self.model_loaded = True
 
     async def _load_models(self):
         """Load summarization models with better error handling"""
         try:
-            from transformers import pipeline
+            from transformers import AutoTokenizer, pipeline
             logger.info("Loading summarization model...")
-            self.summarizer_pipeline = pipeline(
-                "summarization",
-                model=settings.MODEL_NAME,
-                device="cpu"
-            )
+            # Rust-backed tokenizer, built once and shared by every request
+            self.tokenizer = AutoTokenizer.from_pretrained(settings.MODEL_NAME, use_fast=True)
+            self.text_tokenizer = AutoTokenizer.from_pretrained(settings.MODEL_NAME, use_fast=True)
+            if settings.USE_ONNX:
+                self.summarizer_pipeline = pipeline(
+                    "summarization",
+                    model=self._load_onnx_model(),
+                    tokenizer=self.tokenizer
+                )
+            else:
+                self.summarizer_pipeline = pipeline(
+                    "summarization",
+                    model=self._load_torch_model(),
+                    tokenizer=self.tokenizer
+                )
             logger.info("Model loaded successfully")
         except ImportError as e:
-            logger.error(f"Failed to load transformers: {str(e)}")
+            logger.error("Failed to load transformers: %s", e)
             raise RuntimeError(f"Failed to load transformers: {str(e)}")
         except Exception as e:
-            logger.error(f"Model loading failed: {str(e)}")
+            logger.error("Model loading failed: %s", e)
             raise RuntimeError(f"Model loading failed: {str(e)}")
 
+    def _warmup(self):
+        """
+        Run throwaway inferences at startup so the first request doesn't pay for
+        kernel selection, ORT/oneDNN allocation or torch.compile specialization
+        """
+        try:
+            # Two input lengths so dynamic-shape compilation is triggered before serving
+            for repeats in WARMUP_INPUT_REPEATS:
+                self._sync_summarize_batch(["warmup text " * repeats], 30, 10)
+            logger.info("Model warmed up")
+        except Exception as e:
+            logger.warning("Model warmup failed: %s", e)
+
+    def _load_torch_model(self):
+        """PyTorch model; INT8 weights via bitsandbytes when a CUDA GPU is available"""
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, BitsAndBytesConfig
+
+        # bitsandbytes is optional (requirements-optional.txt) and only useful on CUDA
+        if settings.LOAD_IN_8BIT and torch.cuda.is_available() and find_spec("bitsandbytes"):
+            return AutoModelForSeq2SeqLM.from_pretrained(
+                settings.MODEL_NAME,
+                quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                device_map="auto"
+            )
+        # CPU INT8 is served by the ONNX path (USE_ONNX).
+        # Split the cores between worker processes so BLAS threads don't oversubscribe.
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // settings.WORKERS))
+        # Fused scaled-dot-product attention kernels (what BetterTransformer used to patch in)
+        model = AutoModelForSeq2SeqLM.from_pretrained(settings.MODEL_NAME, attn_implementation="sdpa")
+        model.eval()
+
+        if settings.TORCH_COMPILE and hasattr(torch, "compile"):
+            # Compile forward only: generate() keeps calling the original module's forward,
+            # so wrapping the whole model would leave decoding uncompiled
+            model.forward = torch.compile(model.forward, dynamic=True)
+        return model
+
+    def _load_onnx_model(self):
+        """Export the model to ONNX once and quantize it to dynamic INT8 for CPU inference"""
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTOptimizer, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+
+        # Exported, optimized and quantized graphs are cached on disk; later boots skip all of this
+        # (one subdirectory per model, so changing MODEL_NAME never reuses stale graphs)
+        onnx_dir = Path(settings.ONNX_MODEL_DIR) / settings.MODEL_NAME.replace("/", "--")
+        quantized = {name: f"{name}_optimized_quantized.onnx" for name in ONNX_COMPONENTS}
+
+        if not all((onnx_dir / file_name).exists() for file_name in quantized.values()):
+            logger.info("Exporting %s to ONNX in %s", settings.MODEL_NAME, onnx_dir)
+            model = ORTModelForSeq2SeqLM.from_pretrained(settings.MODEL_NAME, export=True)
+            model.save_pretrained(onnx_dir)
+
+            # Transformer-aware graph fusions (attention, reshape, layer norm) for BART.
+            # Level 2 keeps the graph hardware-independent so it can still be quantized.
+            optimizer = ORTOptimizer.from_pretrained(model)
+            optimizer.optimize(
+                save_dir=onnx_dir,
+                optimization_config=OptimizationConfig(
+                    optimization_level=2,
+                    optimize_for_gpu=False,
+                    fp16=False
+                )
+            )
+
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            for name in ONNX_COMPONENTS:
+                quantizer = ORTQuantizer.from_pretrained(onnx_dir, file_name=f"{name}_optimized.onnx")
+                quantizer.quantize(save_dir=onnx_dir, quantization_config=qconfig)
+
+        # Split the cores between worker processes so ORT sessions don't oversubscribe
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // settings.WORKERS)
+
+        return ORTModelForSeq2SeqLM.from_pretrained(
+            onnx_dir,
+            encoder_file_name=quantized["encoder_model"],
+            decoder_file_name=quantized["decoder_model"],
+            decoder_with_past_file_name=quantized["decoder_with_past_model"],
+            provider="CPUExecutionProvider",
+            session_options=session_options
+        )
+
     async def summarize_content(
         self,
         content: Union[SummaryRequest, UploadFile],
@@ -85,93 +351,167 @@ class SummarizationService:
                 detail="Invalid input type - must be text or file"
             )
 
+    async def save_upload(self, file: UploadFile) -> Tuple[Optional[str], int, str]:
+        """
+        Stream an upload through the size check and SHA-256 in chunks; aborts with
+        413 as soon as it exceeds the size limit. Only PDFs are copied to a temp file
+        (process-pool workers open them by path); DOCX/PPTX are read later straight
+        from the upload's own spooled file. Returns (temp_path, size_in_bytes, sha256_hex).
+        """
+        max_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+        file_ext = Path(file.filename).suffix.lower()
+        temp_file_path = None
+        if file_ext in PATH_EXTRACTED_TYPES:
+            fd, temp_file_path = tempfile.mkstemp(suffix=file_ext)
+            os.close(fd)
+        size = 0
+        digest = hashlib.sha256()
+        try:
+            out_file = aiofiles.open(temp_file_path, "wb") if temp_file_path else nullcontext()
+            async with out_file as out:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large (>{settings.MAX_FILE_SIZE_MB}MB)"
+                        )
+                    digest.update(chunk)
+                    if out is not None:
+                        await out.write(chunk)
+        except BaseException:
+            if temp_file_path:
+                Path(temp_file_path).unlink(missing_ok=True)
+            raise
+        await file.seek(0)
+        return temp_file_path, size, digest.hexdigest()
+
     async def process_uploaded_file(
         self,
         file: UploadFile,
         method: str,
+        temp_file_path: Optional[str] = None,
+        content_hash: Optional[str] = None,
         **kwargs
     ) -> str:
+        """
+        Summarize an upload; pass `temp_file_path` and `content_hash` if it was
+        already saved with save_upload
+        """
         file_ext = Path(file.filename).suffix.lower()
-        temp_file_path = None
+        owns_temp_file = content_hash is None
 
         try:
-            contents = await file.read()
-
-            if len(contents) > settings.max_file_size_mb * 1024 * 1024:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"File too large (>{settings.max_file_size_mb}MB)"
-                )
+            if owns_temp_file:
+                temp_file_path, _, content_hash = await self.save_upload(file)
 
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_file.write(contents)
-                temp_file_path = temp_file.name
-
-            if file_ext == '.pdf':
-                text = await self.extract_text_from_pdf(temp_file_path)
-            elif file_ext == '.docx':
-                text = await self.extract_text_from_docx(temp_file_path)
-            elif file_ext == '.pptx':
-                text = await self.extract_text_from_pptx(temp_file_path)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                    detail="Unsupported file type"
-                )
-
-            text = self.clean_text(text)
-            if len(text.split()) > settings.max_text_length:
-                text = " ".join(text.split()[:settings.max_text_length])
+            # Same bytes (retries, re-uploads) skip extraction and cleaning entirely
+            text_key = (content_hash, file_ext)
+            if (text := self.text_cache.get(text_key)) is None:
+                text = await self.extract_text(temp_file_path or file.file, file_ext)
+                self.text_cache[text_key] = text
 
             return await self.summarize_text(text, method, **kwargs)
 
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail=f"File processing error: {str(e)}"
             )
         finally:
-            if temp_file_path:
+            if owns_temp_file and temp_file_path:
                 Path(temp_file_path).unlink(missing_ok=True)
 
+    async def extract_text(self, source: Union[str, BinaryIO], file_ext: str) -> str:
+        """Extract, clean and truncate the text of an upload (a path for PDFs, else a stream)"""
+        if file_ext == '.pdf':
+            text = await self.extract_text_from_pdf(source)
+        elif file_ext == '.docx':
+            text = await self.extract_text_from_docx(source)
+        elif file_ext == '.pptx':
+            text = await self.extract_text_from_pptx(source)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Unsupported file type"
+            )
+
+        text = self.clean_text(text)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(_CPU_POOL, self._truncate_to_tokens, text)
+
+    def _truncate_to_tokens(self, text: str) -> str:
+        """Cap the text at settings.MAX_TEXT_LENGTH model tokens"""
+        max_tokens = settings.MAX_TEXT_LENGTH
+        if self.text_tokenizer is None:
+            words = text.split()
+            return " ".join(words[:max_tokens]) if len(words) > max_tokens else text
+
+        # No token is anywhere near this many characters, so the tokenizer never sees
+        # more of a huge document than it could keep
+        text = text[:max_tokens * MAX_CHARS_PER_TOKEN]
+        with self.text_tokenizer_lock:
+            ids = self.text_tokenizer(
+                text, truncation=True, max_length=max_tokens, add_special_tokens=False
+            )["input_ids"]
+            if len(ids) < max_tokens:
+                return text
+            return self.text_tokenizer.decode(ids, skip_special_tokens=True)
+
     async def extract_text_from_pdf(self, file_path: str) -> str:
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._sync_extract_pdf_text, file_path)
+        return await loop.run_in_executor(_IO_POOL, self._sync_extract_pdf_text, file_path)
 
     def _sync_extract_pdf_text(self, file_path: str) -> str:
-        text = ""
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-        return text
-
-    async def extract_text_from_docx(self, file_path: str) -> str:
+        with fitz.open(file_path) as doc:
+            page_count = doc.page_count
+            if self.pdf_pool is None or page_count < PARALLEL_PDF_MIN_PAGES:
+                return _pdf_pages_text(doc, 0, page_count)
+
+        # One contiguous page range per worker, so each process opens the file once
+        step = -(-page_count // self.pdf_pool_workers)
+        starts = range(0, page_count, step)
+        parts = self.pdf_pool.map(
+            _extract_pdf_pages,
+            repeat(file_path),
+            starts,
+            (min(start + step, page_count) for start in starts)
+        )
+        return "\n".join(parts)
+
+    async def extract_text_from_docx(self, source: Union[str, BinaryIO]) -> str:
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._sync_extract_docx_text, file_path)
+        return await loop.run_in_executor(_IO_POOL, self._sync_extract_docx_text, source)
 
-    def _sync_extract_docx_text(self, file_path: str) -> str:
-        doc = docx.Document(file_path)
+    def _sync_extract_docx_text(self, source: Union[str, BinaryIO]) -> str:
+        doc = docx.Document(source)
         return "\n".join([para.text for para in doc.paragraphs])
 
-    async def extract_text_from_pptx(self, file_path: str) -> str:
+    async def extract_text_from_pptx(self, source: Union[str, BinaryIO]) -> str:
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._sync_extract_pptx_text, file_path)
+        return await loop.run_in_executor(_IO_POOL, self._sync_extract_pptx_text, source)
 
-    def _sync_extract_pptx_text(self, file_path: str) -> str:
-        prs = Presentation(file_path)
+    def _sync_extract_pptx_text(self, source: Union[str, BinaryIO]) -> str:
+        # Walk the DrawingML text directly with lxml instead of building python-pptx
+        # shape objects; runs are joined per paragraph, paragraphs per line, and
+        # soft line breaks (a:br, "\v" in shape.text) become newlines
+        prs = Presentation(source)
         text = []
         for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text.append(shape.text)
+            for paragraph in slide.element.iter(PPTX_PARAGRAPH_TAG):
+                line = "".join(
+                    "\n" if element.tag == PPTX_BREAK_TAG else element.text or ""
+                    for element in paragraph.iter(PPTX_TEXT_TAG, PPTX_BREAK_TAG)
+                )
+                if line:
+                    text.append(line)
         return "\n".join(text)
 
     def clean_text(self, text: str) -> str:
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[^\w\s.,;:!?()-]', '', text)
+        # One scan: whitespace runs become a space, disallowed characters are dropped
+        text = CLEAN_TEXT_RE.sub(lambda m: " " if m.group(1) else "", text)
         return text.strip()
 
     async def summarize_text(
@@ -189,25 +529,21 @@ class SummarizationService:
                 detail="No text content found"
             )
 
+        key = self._summary_cache_key(text, method, max_length, min_length, sentences_count, tone)
+        if (cached := await self._get_cached_summary(key)) is not None:
+            return cached
+
         try:
             if method == "transformers":
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    None,
-                    lambda: self.summarizer_pipeline(
-                        text,
-                        max_length=max_length,
-                        min_length=min_length,
-                        do_sample=False
-                    )
-                )
-                raw_summary = result[0]["summary_text"]
-
-                return self.apply_tone(raw_summary, tone)
+                raw_summary = await self._transformers_summarize(text, max_length, min_length)
+                summary = self.apply_tone(raw_summary, tone)
 
             else:
                 summary = await self._sumy_summarize(text, sentences_count)
-                return self.apply_tone(summary, tone)
+                summary = self.apply_tone(summary, tone)
+
+            await self._store_summary(key, summary)
+            return summary
 
         except Exception as e:
             raise HTTPException(
@@ -215,6 +551,83 @@ class SummarizationService:
                 detail=f"Summarization failed: {str(e)}"
             )
 
+    @staticmethod
+    def _summary_cache_key(text: str, *params) -> bytes:
+        """Digest of the text and every parameter that affects the summary"""
+        # Model and decoding settings too: the Redis cache outlives deploys that change them
+        params = (settings.MODEL_NAME, settings.FAST_GENERATION, *params)
+        prefix = "|".join(str(getattr(p, "value", p)) for p in params)
+        return hashlib.blake2b(f"{prefix}|{text}".encode(), digest_size=16).digest()
+
+    async def _get_cached_summary(self, key: bytes) -> Optional[str]:
+        """Look in the in-process LRU first, then the shared Redis cache"""
+        if (cached := self.summary_cache.get(key)) is not None:
+            return cached
+        if self.redis is None:
+            return None
+        try:
+            cached = await self.redis.get(f"summary:{key.hex()}")
+        except Exception as e:
+            logger.warning("Summary cache lookup failed: %s", e)
+            return None
+        if cached is not None:
+            self.summary_cache[key] = cached
+        return cached
+
+    async def _store_summary(self, key: bytes, summary: str):
+        self.summary_cache[key] = summary
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(f"summary:{key.hex()}", summary, ex=SUMMARY_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("Summary cache write failed: %s", e)
+
+    async def _transformers_summarize(self, text: str, max_length: int, min_length: int) -> str:
+        """
+        Map-reduce summarization: every chunk goes through the batcher (so the
+        chunks share forward passes), then the joined partial summaries are
+        summarized once more.
+        """
+        loop = asyncio.get_event_loop()
+        chunks = await loop.run_in_executor(_CPU_POOL, self._split_into_chunks, text)
+        if len(chunks) == 1:
+            return await self.batcher.submit(chunks[0], max_length, min_length)
+
+        partials = await asyncio.gather(
+            *(self.batcher.submit(chunk, max_length, min_length) for chunk in chunks)
+        )
+        return await self.batcher.submit(" ".join(partials), max_length, min_length)
+
+    def _split_into_chunks(self, text: str) -> List[str]:
+        """Tokenize once and cut the text into overlapping windows the model can see whole"""
+        with self.text_tokenizer_lock:
+            encoded = self.text_tokenizer(
+                text,
+                max_length=CHUNK_MAX_TOKENS,
+                stride=CHUNK_STRIDE_TOKENS,
+                truncation=True,
+                return_overflowing_tokens=True,
+                add_special_tokens=False
+            )
+            if len(encoded["input_ids"]) == 1:
+                return [text]
+            return self.text_tokenizer.batch_decode(encoded["input_ids"], skip_special_tokens=True)
+
+    def _sync_summarize_batch(self, texts: List[str], max_length: int, min_length: int) -> List[str]:
+        """Run the pipeline once over a batch of texts"""
+        generation_kwargs = FAST_GENERATION_KWARGS if settings.FAST_GENERATION else {}
+        results = self.summarizer_pipeline(
+            texts,
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False,
+            truncation=True,
+            batch_size=len(texts),
+            **generation_kwargs
+        )
+        return [result["summary_text"] for result in results]
+
     def apply_tone(self, summary: str, tone: str) -> str:
         """Modify summary based on tone"""
         if tone == "bullet":
@@ -231,21 +644,17 @@ class SummarizationService:
     async def _sumy_summarize(self, text: str, sentences_count: int) -> str:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(
-            None,
+            _CPU_POOL,
             self._sync_sumy_summarize,
             text,
             sentences_count
         )
 
     def _sync_sumy_summarize(self, text: str, sentences_count: int) -> str:
-        from sumy.parsers.plaintext import PlaintextParser
-        from sumy.nlp.tokenizers import Tokenizer
-        from sumy.summarizers.lsa import LsaSummarizer
+        # Same LSA algorithm as sumy's LsaSummarizer, on sparse matrices + truncated SVD
+        from service.lsa_fast import lsa_summarize
 
-        parser = PlaintextParser.from_string(text, Tokenizer("english"))
-        summarizer = LsaSummarizer()
-        summary = summarizer(parser.document, sentences_count)
-        return " ".join(str(sentence) for sentence in summary)
+        return lsa_summarize(text, sentences_count)
 
     @staticmethod
     def validate_file_type(content_type: str, filename: str):
@@ -255,5 +664,14 @@ class SummarizationService:
         if ALLOWED_FILE_TYPES[content_type] != ext:
             raise HTTPException(400, "File extension doesn't match content type")
 
+def _pdf_pages_text(doc, start: int, stop: int) -> str:
+    # MuPDF (C) extraction; "text" mode skips layout reconstruction
+    return "\n".join(doc[i].get_text("text") for i in range(start, stop))
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> str:
+    """Text of pages [start, stop); module-level so process pool workers can run it"""
+    with fitz.open(file_path) as doc:
+        return _pdf_pages_text(doc, start, stop)
+
 # Singleton instance
 summarization_service = SummarizationService()
@@ -1,6 +1,103 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Set
 from googletrans import Translator
+from langdetect import DetectorFactory, LangDetectException, detect
+from service.config import settings
 
-def translate_text(text: str, target_lang: str = "es") -> str:
-    translator = Translator()
-    translated = translator.translate(text, dest=target_lang)
-    return translated.text
\ No newline at end of file
+# Deterministic language detection
+DetectorFactory.seed = 0
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+# Marian models see at most 512 tokens; segments are packed well below that
+MARIAN_MAX_TOKENS = 400
+# Sentences longer than this many words are split before packing
+MARIAN_MAX_WORDS = 150
+MARIAN_BATCH_SIZE = 8
+
+_translator: Optional[Translator] = None
+# Targets with no published en->target MarianMT model
+_unavailable_models: Set[str] = set()
+
+def initialize():
+    """Create the shared Translator client"""
+    global _translator
+    if _translator is None:
+        _translator = Translator()
+
+@lru_cache(maxsize=4)
+def _load_marian(target_lang: str):
+    """Load the en->target MarianMT model (FP16 on GPU, dynamic INT8 on CPU)"""
+    import torch
+    from transformers import MarianMTModel, MarianTokenizer
+
+    model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"
+    tokenizer = MarianTokenizer.from_pretrained(model_name)
+    model = MarianMTModel.from_pretrained(model_name).eval()
+    if torch.cuda.is_available():
+        model = model.half().to("cuda")
+    else:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return tokenizer, model
+
+def _is_english(text: str) -> bool:
+    """Offline source-language check; the local models only translate from English"""
+    try:
+        return detect(text) == "en"
+    except LangDetectException:
+        return False
+
+def _segments(text: str, tokenizer) -> List[str]:
+    """Pack sentences into segments that fit the model's input window"""
+    pieces = []
+    for sentence in SENTENCE_SPLIT_RE.split(text.strip()):
+        words = sentence.split()
+        pieces.extend(
+            " ".join(words[i:i + MARIAN_MAX_WORDS]) for i in range(0, len(words), MARIAN_MAX_WORDS)
+        )
+    lengths = [len(ids) for ids in tokenizer(pieces, add_special_tokens=False)["input_ids"]]
+
+    segments, current, current_tokens = [], [], 0
+    for piece, length in zip(pieces, lengths):
+        if current and current_tokens + length > MARIAN_MAX_TOKENS:
+            segments.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += length
+    if current:
+        segments.append(" ".join(current))
+    return segments
+
+def _marian_translate(text: str, target_lang: str) -> Optional[str]:
+    if target_lang in _unavailable_models:
+        return None
+    try:
+        tokenizer, model = _load_marian(target_lang)
+    except OSError:
+        _unavailable_models.add(target_lang)
+        return None
+
+    import torch
+    segments = _segments(text, tokenizer)
+    translated = []
+    # Long inputs are translated segment by segment, in batches, so nothing is cut off
+    for start in range(0, len(segments), MARIAN_BATCH_SIZE):
+        batch = segments[start:start + MARIAN_BATCH_SIZE]
+        inputs = tokenizer(batch, return_tensors="pt", padding=True, truncation=True).to(model.device)
+        with torch.inference_mode():
+            output = model.generate(**inputs)
+        translated.extend(tokenizer.batch_decode(output, skip_special_tokens=True))
+    return " ".join(translated)
+
+def translate_text(text: str, target_lang: str = "es", source_lang: str = "auto") -> str:
+    # Local model first (no network hop) when the source is English; Google otherwise
+    if settings.USE_LOCAL_TRANSLATION:
+        is_english = source_lang == "en" or (source_lang == "auto" and _is_english(text))
+        if is_english:
+            translated = _marian_translate(text, target_lang)
+            if translated is not None:
+                return translated
+
+    initialize()
+    translated = _translator.translate(text, src=source_lang, dest=target_lang)
+    return translated.text
@@ -1,7 +1,77 @@
 from gtts import gTTS
+import asyncio
 import os
-from typing import Optional
+import re
+import shutil
+import uuid
+import wave
+from typing import List, Optional
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from service.tts_dispatcher import TTSDispatcher
+from service.config import settings
+
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+MAX_CONCURRENT_CHUNKS = 3
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on sentence boundaries, dropping empty pieces"""
+    return [sentence for sentence in SENTENCE_SPLIT_RE.split(text.strip()) if sentence]
+
+# Piper voices loaded once per (worker) process
+_piper_voices = {}
+
+def _get_piper_voice(lang: str):
+    model_path = settings.PIPER_VOICES.get(lang)
+    if model_path is None:
+        return None
+    if lang not in _piper_voices:
+        from piper import PiperVoice
+        _piper_voices[lang] = PiperVoice.load(model_path)
+    return _piper_voices[lang]
+
+def audio_extension(lang: str) -> str:
+    """Piper voices produce WAV, gTTS produces MP3"""
+    return ".wav" if lang in settings.PIPER_VOICES else ".mp3"
+
+def _sync_generate_speech(text: str, lang: str, output_path: str, speed: float):
+    """Blocking synthesis; writes to a unique temp file then moves it into place"""
+    # Unique per call: identical requests in other worker processes may run concurrently
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+
+    try:
+        voice = _get_piper_voice(lang)
+        if voice is not None:
+            # On-device neural TTS: no network round-trip
+            with wave.open(temp_path, "wb") as wav_file:
+                voice.synthesize(text, wav_file, length_scale=1.0 / speed)
+        else:
+            tts = gTTS(text=text, lang=lang, slow=False)
+            tts.save(temp_path)
+            # Speed adjustment would go here (requires pydub/ffmpeg for premium)
+
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def _concat_parts(part_paths: List[str], output_path: str):
+    """Join MP3 parts in order (MP3 frames can be concatenated as-is)"""
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "wb") as out:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, out)
+    os.replace(temp_path, output_path)
+
+def _remove_parts(part_paths: List[str]):
+    for part_path in part_paths:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+# Shared dispatcher: identical in-flight requests share one synthesis
+tts_dispatcher = TTSDispatcher(_sync_generate_speech)
 
 async def generate_speech(
     text: str,
@@ -10,18 +80,34 @@ async def generate_speech(
     speed: float = 1.0
 ):
     """Generate speech audio file using gTTS"""
+    part_paths: List[str] = []
     try:
-        tts = gTTS(text=text, lang=lang, slow=False)
-        
-        # Adjust speed by modifying temp file
-        temp_path = "temp.mp3"
-        tts.save(temp_path)
-        
-        # Speed adjustment would go here (requires pydub/ffmpeg for premium)
-        os.rename(temp_path, output_path)
-        
+        chunks = split_sentences(text)
+        # Piper synthesizes locally sentence by sentence already, and WAV parts can't be concatenated
+        if len(chunks) <= 1 or audio_extension(lang) != ".mp3":
+            await tts_dispatcher.submit(text, lang, output_path, speed)
+            return
+
+        # Synthesize sentences in parallel (bounded), then stitch them back in order
+        prefix = f"{output_path}.{uuid.uuid4().hex}"
+        part_paths = [f"{prefix}.part{i}" for i in range(len(chunks))]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+        async def synthesize_chunk(chunk: str, part_path: str):
+            async with semaphore:
+                await tts_dispatcher.submit(chunk, lang, part_path, speed)
+
+        await asyncio.gather(*(
+            synthesize_chunk(chunk, part_path) for chunk, part_path in zip(chunks, part_paths)
+        ))
+        await run_in_threadpool(_concat_parts, part_paths, output_path)
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"TTS generation failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+    finally:
+        # Disk stats/unlinks stay off the event loop
+        if part_paths:
+            await run_in_threadpool(_remove_parts, part_paths)
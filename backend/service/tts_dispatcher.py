@@ -0,0 +1,38 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Dict, Optional
+
+
+class TTSDispatcher:
+    """
+    Runs speech synthesis on an executor as soon as it is requested (gTTS and Piper
+    can't batch, so there is nothing to gain by waiting). Identical requests (same
+    output path) share a single synthesis while it is in flight.
+    """
+
+    def __init__(self, synthesize: Callable[[str, str, str, float], None]):
+        self.synthesize = synthesize
+        self.executor: Optional[Executor] = None
+        # output_path -> synthesis currently running for it
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    def start(self, executor: Optional[Executor] = None):
+        """`executor` (e.g. a process pool) runs the synthesis calls"""
+        if executor is not None:
+            self.executor = executor
+
+    async def stop(self):
+        """Wait for running syntheses so the executor can be shut down cleanly"""
+        await asyncio.gather(*self.in_flight.values(), return_exceptions=True)
+
+    async def submit(self, text: str, lang: str, output_path: str, speed: float) -> str:
+        job = self.in_flight.get(output_path)
+        if job is None:
+            job = asyncio.get_running_loop().run_in_executor(
+                self.executor, self.synthesize, text, lang, output_path, speed
+            )
+            self.in_flight[output_path] = job
+            job.add_done_callback(lambda _: self.in_flight.pop(output_path, None))
+        # Shielded: one caller going away must not cancel the synthesis for the others
+        await asyncio.shield(job)
+        return output_path
@@ -0,0 +1,35 @@
+import pytest
+
+pptx = pytest.importorskip("pptx")
+summarizer = pytest.importorskip("service.summarizer")
+
+
+def _make_deck(path, *paragraphs):
+    prs = pptx.Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    text_frame = slide.shapes.add_textbox(0, 0, 100, 100).text_frame
+    text_frame.text = paragraphs[0]
+    for paragraph in paragraphs[1:]:
+        text_frame.add_paragraph().text = paragraph
+    prs.save(path)
+
+
+def test_line_break_inside_paragraph_separates_text(tmp_path):
+    path = tmp_path / "deck.pptx"
+    # "\v" is written as an a:br soft line break
+    _make_deck(path, "Hello\vWorld")
+
+    service = summarizer.SummarizationService()
+    text = service._sync_extract_pptx_text(str(path))
+
+    assert text == "Hello\nWorld"
+    assert service.clean_text(text) == "Hello World"
+
+
+def test_paragraphs_are_one_per_line(tmp_path):
+    path = tmp_path / "deck.pptx"
+    _make_deck(path, "First point", "Second point")
+
+    text = summarizer.SummarizationService()._sync_extract_pptx_text(str(path))
+
+    assert text == "First point\nSecond point"